@@ -1,10 +1,21 @@
 import json
-import uuid
+from collections import Counter
+from contextlib import contextmanager
 from datetime import datetime
 import logging
+import os
+import re
+import sys
 from fileinput import lineno
+from bisect import bisect_left, bisect_right
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Optional,
+                    TextIO, Tuple)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logging.basicConfig(
     level=logging.INFO,
@@ -14,12 +25,169 @@ logging.basicConfig(
         logging.FileHandler("library.log", encoding='utf-8'),
     ])
 
+# Number of logged operations after which the snapshot is rewritten.
+COMPACT_THRESHOLD = 1000
+
+# Book statuses. Book interns every status, so books share these objects.
+STATUS_AVAILABLE = sys.intern('в наличии')
+STATUS_CHECKED_OUT = sys.intern('выдана')
+STATUSES = (STATUS_AVAILABLE, STATUS_CHECKED_OUT)
+
+# Files larger than this (in bytes) are parsed as a stream, not all at once.
+STREAM_THRESHOLD = 64 * 1024 * 1024
+
+# The joined haystack is only searched when a query occurs at most once
+# per this many books; mapping each hit back to its book costs far more
+# than testing a value in a plain scan.
+SPARSE_HIT_RATIO = 32
+
+# Whitespace allowed between JSON tokens (narrower than str.isspace).
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def dump_json(data: Any,
+              default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Serialize data to compact UTF-8 encoded JSON.
+
+    Uses orjson when it is installed and the standard json module otherwise.
+
+    Args:
+        data (Any): Data to serialize.
+        default (callable, optional): Converts objects that are not
+            serializable as is, e.g. ``Book.to_dict``.
+
+    Returns:
+        bytes: Serialized data.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=default)
+    return json.dumps(data, separators=(',', ':'), default=default,
+                      ensure_ascii=False).encode('utf-8')
+
+
+def load_json(data: bytes) -> Any:
+    """Deserialize UTF-8 encoded JSON.
+
+    Args:
+        data (bytes): Data to deserialize.
+
+    Returns:
+        Any: Deserialized data.
+
+    Raises:
+        json.JSONDecodeError: If the data is not valid JSON.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def iter_json_array(file: TextIO,
+                    chunk_size: int = 64 * 1024) -> Iterator[Any]:
+    """Parse a JSON array from a file item by item.
+
+    Only one chunk of the file and the current item are kept in memory.
+
+    Args:
+        file (TextIO): File containing a JSON array.
+        chunk_size (int): Number of characters to read at a time.
+
+    Yields:
+        Any: Items of the array.
+
+    Raises:
+        json.JSONDecodeError: If the file is not a valid JSON array.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+    expected = '['
+    while True:
+        pos = _WHITESPACE.match(buffer, pos).end()
+        need_more = pos == len(buffer)
+        if not need_more and expected == 'item':
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+                # A number cut by the chunk boundary (e.g. "1." of "1.5")
+                # still decodes, so the item only counts as complete once
+                # the separator after it has been read.
+                after = _WHITESPACE.match(buffer, end).end()
+                need_more = not eof and (after == len(buffer)
+                                         or buffer[after] not in ',]')
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                need_more = True
+        if need_more:
+            if eof:
+                if expected == 'end':
+                    return
+                raise json.JSONDecodeError('Unexpected end of data',
+                                           buffer, pos)
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        if expected == 'item':
+            yield item
+            pos = end
+            expected = ','
+            continue
+        char = buffer[pos]
+        if expected == '[' and char == '[':
+            expected = 'first'
+        elif expected in ('first', ',') and char == ']':
+            # Only whitespace may follow the array.
+            expected = 'end'
+        elif expected == 'first':
+            expected = 'item'
+            continue
+        elif expected == ',' and char == ',':
+            expected = 'item'
+        else:
+            raise json.JSONDecodeError(f'Unexpected {char!r}', buffer, pos)
+        pos += 1
+
+
+def _compile_any(queries: List[str]) -> Callable[[str], Any]:
+    """Compile substrings into one pattern matching any of them.
+
+    Every value is then scanned once regardless of the number of queries.
+
+    Args:
+        queries (list[str]): Substrings to search for.
+
+    Returns:
+        callable: ``search`` method of the pattern, to be called with
+            casefolded values.
+    """
+    return re.compile('|'.join(re.escape(query.casefold())
+                               for query in queries)).search
+
+
+def generate_book_id() -> str:
+    """Generate a random ID in the canonical UUID4 format.
+
+    Equivalent to ``str(uuid.uuid4())`` without building a UUID object.
+
+    Returns:
+        str: New book ID.
+    """
+    h = os.urandom(16).hex()
+    variant = '89ab'[int(h[16], 16) & 3]
+    return f'{h[:8]}-{h[8:12]}-4{h[13:16]}-{variant}{h[17:20]}-{h[20:]}'
+
 
 class Book:
     """Class for representing a book in the library."""
 
+    __slots__ = ('id', '_title', '_title_lc', '_author', '_author_lc',
+                 '_year', '_status', '_library')
+
     def __init__(self, title: str, author: str, year: int,
-                 status: str) -> None:
+                 status: str, book_id: Optional[str] = None) -> None:
         """Initialize a book.
 
         Args:
@@ -27,12 +195,72 @@ class Book:
             author (str): Author of the book.
             year (int): Year of publication.
             status (str): Status of the book (e.g., 'available', 'checked out').
+            book_id (str, optional): ID of the book. A new one is generated
+                if not given.
         """
-        self.id: str = str(uuid.uuid4())
-        self.title: str = title
-        self.author: str = author
-        self.year: int = year
-        self.status: str = status
+        self.id: str = book_id or generate_book_id()
+        # Library holding the book, told when its title, author, year or
+        # status changes.
+        self._library: Optional['Library'] = None
+        self.title = title
+        self.author = author
+        self.year = year
+        self.status = status
+
+    @property
+    def title(self) -> str:
+        """Title of the book."""
+        return self._title
+
+    @title.setter
+    def title(self, value: str) -> None:
+        old_key = self._key() if self._library is not None else None
+        self._title: str = value
+        self._title_lc: str = value.casefold()
+        if old_key is not None:
+            self._library._book_changed(self, old_key)
+
+    @property
+    def author(self) -> str:
+        """Author of the book."""
+        return self._author
+
+    @author.setter
+    def author(self, value: str) -> None:
+        old_key = self._key() if self._library is not None else None
+        self._author: str = value
+        self._author_lc: str = value.casefold()
+        if old_key is not None:
+            self._library._book_changed(self, old_key)
+
+    @property
+    def year(self) -> int:
+        """Year of publication."""
+        return self._year
+
+    @year.setter
+    def year(self, value: int) -> None:
+        old_key = self._key() if self._library is not None else None
+        self._year: int = value
+        if old_key is not None:
+            self._library._book_changed(self, old_key)
+
+    def _key(self) -> Tuple[str, str, int]:
+        """Get the fields that identify a duplicate book."""
+        return self._title, self._author, self._year
+
+    @property
+    def status(self) -> str:
+        """Status of the book."""
+        return self._status
+
+    @status.setter
+    def status(self, value: str) -> None:
+        # Hand-edited files may hold e.g. null, which cannot be interned.
+        self._status: str = (sys.intern(value) if type(value) is str
+                             else value)
+        if self._library is not None:
+            self._library._dirty = True
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert the book to a dictionary for serialization.
@@ -59,7 +287,7 @@ class Book:
             Book: An instance of the book.
         """
         return Book(data['title'], data['author'], data['year'],
-                    data['status'])
+                    data['status'], data.get('id'))
 
     def __repr__(self):
         return (f"Book(title={self.title}, author={self.author},"
@@ -72,29 +300,256 @@ class Library:
     def __init__(self, filename: Path) -> None:
         """Initialize the library.
 
+        Changes are appended to an operation log next to the file
+        (with the ``.jsonl`` suffix) and folded into the file itself every
+        ``COMPACT_THRESHOLD`` operations.
+
         Args:
             filename (Path): Path to the file for storing book data.
         """
-        self.books: List[Book] = []
+        self.books = []
         self.filename: Path = filename
+        self.log_filename: Path = filename.with_suffix('.jsonl')
+        self._ops_since_snapshot: int = 0
+        self._log_torn: bool = False
+        self._batch_ops: Optional[List[Dict[str, Any]]] = None
         self.load_books()
 
+    @property
+    def books(self) -> List[Book]:
+        """Books stored in the library.
+
+        The list is returned as is and callers may change it, so handing
+        it out marks the library as changed for ``save_books``.
+        """
+        self._dirty = True
+        return self._books
+
+    @books.setter
+    def books(self, books: List[Book]) -> None:
+        """Replace all books and rebuild the search indexes."""
+        for book in getattr(self, '_books', ()):
+            book._library = None
+        self._books: List[Book] = list(books)
+        for book in self._books:
+            book._library = self
+        self._dirty: bool = True
+        self._haystacks: Dict[str, Tuple[str, List[int]]] = {}
+        self._title_order: Optional[Tuple[List[str], List[Book]]] = None
+        self._by_id: Dict[str, Book] = {book.id: book for book in self._books}
+        # Counts rather than a set: files may hold the same book twice.
+        self._keys: Counter = Counter(book._key() for book in self._books)
+        self._by_year: Dict[int, List[Book]] = {}
+        for book in self._books:
+            self._by_year.setdefault(book.year, []).append(book)
+
+    def _append(self, book: Book) -> None:
+        """Append a book to the list and all search indexes."""
+        self._books.append(book)
+        book._library = self
+        self._haystacks.clear()
+        self._title_order = None
+        self._by_id[book.id] = book
+        self._keys[book._key()] += 1
+        self._by_year.setdefault(book.year, []).append(book)
+
+    def _remove(self, book: Book) -> None:
+        """Remove a book from the list and all search indexes."""
+        self._books.remove(book)
+        book._library = None
+        self._haystacks.clear()
+        self._title_order = None
+        del self._by_id[book.id]
+        self._discard_key(book._key())
+        same_year = self._by_year[book.year]
+        same_year.remove(book)
+        if not same_year:
+            del self._by_year[book.year]
+
+    def _discard_key(self, key: Tuple[str, str, int]) -> None:
+        """Forget one book with the given title, author and year."""
+        self._keys[key] -= 1
+        if not self._keys[key]:
+            del self._keys[key]
+
+    def _book_changed(self, book: Book, old_key: Tuple[str, str, int]) -> None:
+        """Update the indexes after a book's title, author or year changed.
+
+        Args:
+            book (Book): The changed book.
+            old_key (tuple): Title, author and year before the change.
+        """
+        self._dirty = True
+        self._haystacks.clear()
+        self._title_order = None
+        self._discard_key(old_key)
+        self._keys[book._key()] += 1
+        old_year = old_key[2]
+        if old_year != book.year:
+            same_year = self._by_year[old_year]
+            same_year.remove(book)
+            if not same_year:
+                del self._by_year[old_year]
+            self._by_year.setdefault(book.year, []).append(book)
+
     def load_books(self):
+        missing_ids = False
         if self.filename.exists():
             try:
-                with self.filename.open('r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.books = [Book.from_dict(book) for book in data]
+                if self.filename.stat().st_size > STREAM_THRESHOLD:
+                    with self.filename.open('r', encoding='utf-8') as f:
+                        books = []
+                        for data in iter_json_array(f):
+                            missing_ids = missing_ids or 'id' not in data
+                            books.append(Book.from_dict(data))
+                else:
+                    with self.filename.open('rb') as f:
+                        data = load_json(f.read())
+                    books = [Book.from_dict(book) for book in data]
+                    missing_ids = any('id' not in book for book in data)
+                self.books = books
                 logging.info(f'Books loaded from file {self.filename}.')
             except (json.JSONDecodeError, FileNotFoundError) as e:
                 logging.error(f'Error loading books: {e}')
+        self._replay_log()
+        self._dirty = missing_ids or self._ops_since_snapshot > 0
+        if missing_ids:
+            # Logged operations refer to books by ID, so generated IDs
+            # have to be persisted before anything is logged.
+            self.save_books()
+
+    def _replay_log(self) -> None:
+        """Apply the operations logged since the last snapshot.
+
+        Replaying is idempotent, so operations that already made it into
+        the snapshot are harmless. A last line without a newline is left
+        by an interrupted append; it is terminated before the next append
+        so that new operations do not end up on the same line.
+        """
+        self._ops_since_snapshot = 0
+        self._log_torn = False
+        if not self.log_filename.exists():
+            return
+        try:
+            with self.log_filename.open('rb') as f:
+                for line in f:
+                    self._log_torn = not line.endswith(b'\n')
+                    if not line.strip():
+                        continue
+                    try:
+                        op = load_json(line)
+                    except json.JSONDecodeError as e:
+                        logging.error(f'Skipping broken log entry: {e}')
+                        continue
+                    self._apply_op(op)
+                    self._ops_since_snapshot += 1
+            logging.info(f'Operations replayed from file '
+                         f'{self.log_filename}.')
+        except IOError as e:
+            logging.error(f'Error replaying operations: {e}')
+
+    def _apply_op(self, op: Dict[str, Any]) -> None:
+        """Apply a single logged operation to the books in memory.
+
+        Args:
+            op (dict): Operation as written by ``_append_op``.
+        """
+        if op['op'] == 'add':
+            if op['book']['id'] not in self._by_id:
+                self._append(Book.from_dict(op['book']))
+        elif op['op'] == 'del':
+            book = self._by_id.get(op['id'])
+            if book is not None:
+                self._remove(book)
+        elif op['op'] == 'status':
+            book = self._by_id.get(op['id'])
+            if book is not None:
+                book.status = op['status']
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Group several changes into a single write.
+
+        Operations made inside the block are kept in memory and appended
+        to the log in one go when the block exits. Nested blocks join the
+        outermost one.
+
+        Example:
+            with library.batch():
+                for title, author, year in rows:
+                    library.add_book(title, author, year)
+        """
+        if self._batch_ops is not None:
+            yield
+            return
+        self._batch_ops = []
+        try:
+            yield
+        finally:
+            ops, self._batch_ops = self._batch_ops, None
+            self._write_ops(ops)
+
+    def _append_op(self, op: Dict[str, Any]) -> None:
+        """Append an operation to the log instead of rewriting the file.
+
+        Args:
+            op (dict): Operation to log.
+        """
+        self._dirty = True
+        if self._batch_ops is not None:
+            self._batch_ops.append(op)
+        else:
+            self._write_ops([op])
+
+    def _write_ops(self, ops: List[Dict[str, Any]]) -> None:
+        """Write operations to the log with a single append.
+
+        Args:
+            ops (list[dict]): Operations to log.
+        """
+        if not ops:
+            return
+        data = b''.join(dump_json(op) + b'\n' for op in ops)
+        if self._log_torn:
+            data = b'\n' + data
+        try:
+            with self.log_filename.open('ab') as file:
+                file.write(data)
+            self._log_torn = False
+            self._ops_since_snapshot += len(ops)
+        except IOError as e:
+            # Part of the data may have been written; start the next
+            # append on a fresh line. An empty line is skipped on replay.
+            self._log_torn = True
+            logging.error(f'Error logging operation: {e}')
+            return
+        self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        """Rewrite the snapshot once enough operations are logged."""
+        if self._ops_since_snapshot > COMPACT_THRESHOLD:
+            self.save_books()
 
     def save_books(self) -> None:
-        """Save books to a file."""
+        """Save books to a file and truncate the operation log.
+
+        The data is written to a temporary file first and then moved over
+        the old one, so a crash never leaves a truncated file behind.
+        Nothing is written if the books did not change since the last save.
+        """
+        if not self._dirty:
+            return
+        tmp_filename = self.filename.with_name(self.filename.name + '.tmp')
         try:
-            with open(self.filename, 'w', encoding='utf-8') as file:
-                json.dump([book.to_dict() for book in self.books], file,
-                          indent=4, ensure_ascii=False)
+            with open(tmp_filename, 'wb') as file:
+                file.write(dump_json(self._books, default=Book.to_dict))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_filename, self.filename)
+            self.log_filename.unlink(missing_ok=True)
+            self._log_torn = False
+            self._ops_since_snapshot = 0
+            self._dirty = False
             logging.info(f'Books saved to file {self.filename}.')
         except IOError as e:
             logging.error(f'Error saving books: {e}')
@@ -107,17 +562,15 @@ class Library:
             author (str): Author of the book.
             year (int): Year of publication.
         """
-        for book in self.books:
-            if (book.title == title and book.author == author and
-                    year == book.year):
-                logging.warning(
-                    f"Book '{title}' by {author} ({year}) already exists.")
-                print(f"Книга: '{title}', автор '{author}' - {year}г. "
-                      "уже существует.")
-                return
-        new_book: Book = Book(title, author, year, status='в наличии')
-        self.books.append(new_book)
-        self.save_books()
+        if (title, author, year) in self._keys:
+            logging.warning(
+                f"Book '{title}' by {author} ({year}) already exists.")
+            print(f"Книга: '{title}', автор '{author}' - {year}г. "
+                  "уже существует.")
+            return
+        new_book: Book = Book(title, author, year, status=STATUS_AVAILABLE)
+        self._append(new_book)
+        self._append_op({'op': 'add', 'book': new_book.to_dict()})
         logging.info(f'Book "{title}" added with ID {new_book.id}.')
         print(f'Книга "{title}" добавлена с ID {new_book.id}.')
 
@@ -129,16 +582,40 @@ class Library:
                 '(или введите "выход" для возврата в главное меню): ')
             if book_id.lower() == 'выход':
                 return
-            book: Optional[Book] = next(
-                (book for book in self.books if book.id == book_id), None)
-            if book:
-                self.books.remove(book)
-                self.save_books()
-                logging.info(f'Book with ID {book_id} deleted.')
-                print(f'Книга с ID {book_id} удалена.')
+            if self.remove_book(book_id):
                 return
-            else:
-                print(f'Книга с ID {book_id} не найдена. Попробуйте снова.')
+            print('Попробуйте снова.')
+
+    def remove_book(self, book_id: str) -> bool:
+        """Remove a book from the library by ID.
+
+        Args:
+            book_id (str): ID of the book to remove.
+
+        Returns:
+            bool: True if the book was removed, False if it was not found.
+        """
+        book: Optional[Book] = self.get_book(book_id)
+        if book is None:
+            logging.warning(f'Book with ID {book_id} not found.')
+            print(f'Книга с ID {book_id} не найдена.')
+            return False
+        self._remove(book)
+        self._append_op({'op': 'del', 'id': book_id})
+        logging.info(f'Book with ID {book_id} deleted.')
+        print(f'Книга с ID {book_id} удалена.')
+        return True
+
+    def get_book(self, book_id: str) -> Optional[Book]:
+        """Get a book by ID.
+
+        Args:
+            book_id (str): ID of the book.
+
+        Returns:
+            Book | None: The book, or None if there is no book with this ID.
+        """
+        return self._by_id.get(book_id)
 
     def find_by_title(self, title: str) -> List[Book]:
         """Search for books by title.
@@ -149,8 +626,36 @@ class Library:
         Returns:
             list[Book]: List of books matching the given title.
         """
-        return [book for book in self.books if
-                title.lower() in book.title.lower()]
+        query = title.casefold()
+        hits = self._find_sparse('_title_lc', query)
+        if hits is None:
+            hits = [book for book in self._books if query in book._title_lc]
+        return hits
+
+    def find_by_title_prefix(self, prefix: str) -> List[Book]:
+        """Search for books whose title starts with the given prefix.
+
+        Books are kept sorted by casefolded title, so matching books are
+        found by bisection instead of a full scan.
+
+        Args:
+            prefix (str): Beginning of the title to search for.
+
+        Returns:
+            list[Book]: List of matching books, ordered by title.
+        """
+        if self._title_order is None:
+            pairs = sorted(((book._title_lc, i)
+                            for i, book in enumerate(self._books)))
+            self._title_order = ([title for title, _ in pairs],
+                                 [self._books[i] for _, i in pairs])
+        titles, books = self._title_order
+        query = prefix.casefold()
+        start = bisect_left(titles, query)
+        end = start
+        while end < len(titles) and titles[end].startswith(query):
+            end += 1
+        return books[start:end]
 
     def find_by_author(self, author: str) -> List[Book]:
         """Search for books by author.
@@ -161,8 +666,96 @@ class Library:
         Returns:
             list[Book]: List of books matching the given author.
         """
-        return [book for book in self.books if
-                author.lower() in book.author.lower()]
+        query = author.casefold()
+        hits = self._find_sparse('_author_lc', query)
+        if hits is None:
+            hits = [book for book in self._books if query in book._author_lc]
+        return hits
+
+    def find_by_titles(self, titles: List[str]) -> List[Book]:
+        """Search for books whose title matches any of the given titles.
+
+        Args:
+            titles (list[str]): Titles of the books to search for.
+
+        Returns:
+            list[Book]: List of books matching at least one title.
+        """
+        if not titles:
+            return []
+        search = _compile_any(titles)
+        return [book for book in self._books if search(book._title_lc)]
+
+    def find_by_authors(self, authors: List[str]) -> List[Book]:
+        """Search for books whose author matches any of the given authors.
+
+        Args:
+            authors (list[str]): Authors of the books to search for.
+
+        Returns:
+            list[Book]: List of books matching at least one author.
+        """
+        if not authors:
+            return []
+        search = _compile_any(authors)
+        return [book for book in self._books if search(book._author_lc)]
+
+    def _haystack(self, field: str) -> Tuple[str, List[int]]:
+        """Get the values of a field joined into a single string.
+
+        Values are separated by NUL characters. The haystack is built on
+        first use and dropped whenever the books change.
+
+        Args:
+            field (str): Name of the casefolded Book attribute.
+
+        Returns:
+            tuple[str, list[int]]: Joined values and the offset at which
+                each book's value starts.
+        """
+        if field not in self._haystacks:
+            values = [getattr(book, field) for book in self._books]
+            offsets = []
+            offset = 0
+            for value in values:
+                offsets.append(offset)
+                offset += len(value) + 1
+            self._haystacks[field] = ('\0'.join(values) + '\0', offsets)
+        return self._haystacks[field]
+
+    def _find_sparse(self, field: str, query: str) -> Optional[List[Book]]:
+        """Collect books containing a rare query through the haystack.
+
+        The haystack is searched with ``str.find`` in C and each hit is
+        mapped back to its book by bisecting the offsets. That costs more
+        per hit than testing a value in a plain scan, so queries occurring
+        more often than once per ``SPARSE_HIT_RATIO`` books are left to the
+        caller, as are queries containing the NUL separator.
+
+        Args:
+            field (str): Name of the casefolded Book attribute to search in.
+            query (str): Casefolded substring to search for.
+
+        Returns:
+            list[Book] | None: Books whose value contains the query, or None
+                if the query is too common for the haystack to pay off.
+        """
+        if not self._books:
+            return []
+        if '\0' in query:
+            return None
+        haystack, offsets = self._haystack(field)
+        if haystack.count(query) * SPARSE_HIT_RATIO > len(offsets):
+            return None
+        results = []
+        position = haystack.find(query)
+        while position != -1:
+            index = bisect_right(offsets, position) - 1
+            results.append(self._books[index])
+            if index + 1 == len(offsets):
+                break
+            position = haystack.find(query, offsets[index + 1])
+        return results
 
     def find_by_year(self, year: int) -> List[Book]:
         """Search for books by publication year.
@@ -173,18 +766,15 @@ class Library:
         Returns:
             list[Book]: List of books matching the given year.
         """
-        return [book for book in self.books if book.year == year]
+        return list(self._by_year.get(year, ()))
 
     def show_books(self) -> None:
         """Display all books in the library."""
-        if not self.books:
+        if not self._books:
             logging.info('No books in the library.')
             print('В библиотеке нет книг.')
         else:
-            for book in self.books:
-                print(f'ID: {book.id}, Название: {book.title}, '
-                      f'Автор: {book.author}, Год: {book.year}, '
-                      f'Статус: {book.status}')
+            print_books(self._books)
 
     def change_status(self, book_id: str, new_status: str) -> None:
         """Change the status of a book.
@@ -194,10 +784,9 @@ class Library:
             new_status (str): New status of the book (available/checked out).
         """
         new_status = new_status.lower()
-        book: Optional[Book] = next(
-            (book for book in self.books if book.id == book_id), None)
+        book: Optional[Book] = self.get_book(book_id)
 
-        if new_status not in ['в наличии', 'выдана']:
+        if new_status not in STATUSES:
             logging.warning('Invalid status.')
             print('Некорректный статус. Доступные статусы: в наличии/выдана.')
             return
@@ -207,8 +796,15 @@ class Library:
             print(f'Книга с ID {book_id} не найдена.')
             return
 
+        if book.status == new_status:
+            logging.info(
+                f'Status of book with ID {book_id} is already "{new_status}".')
+            print(f'Книга с ID {book_id} уже имеет статус "{new_status}".')
+            return
+
         book.status = new_status
-        self.save_books()
+        self._append_op({'op': 'status', 'id': book_id,
+                         'status': new_status})
         logging.info(
             f'Status of book with ID {book_id} changed to "{new_status}".')
         print(f'Статус книги с ID {book_id} изменён на "{new_status}".')
@@ -222,21 +818,31 @@ def change_book_status(library: Library) -> None:
             '(или введите "выход" для возврата в главное меню): ')
         if book_id.lower() == 'выход':
             return
-        book: Optional[Book] = next(
-            (book for book in library.books if book.id == book_id), None)
+        book: Optional[Book] = library.get_book(book_id)
         if book is None:
             print(f'Книга с ID {book_id} не найдена.')
         else:
             while True:
                 new_status = get_non_empty_input(
                     'Введите новый статус (в наличии/выдана): ')
-                if new_status.lower() in ['в наличии', 'выдана']:
+                if new_status.lower() in STATUSES:
                     library.change_status(book_id, new_status)
                     return
                 else:
                     print('Пожалуйста, введите в наличии/выдана')
 
 
+def print_books(books: List[Book]) -> None:
+    """Print books, one per line, with a single write to stdout.
+
+    Args:
+        books (list[Book]): Books to print.
+    """
+    sys.stdout.write(''.join([
+        f'ID: {book.id}, Название: {book.title}, Автор: {book.author}, '
+        f'Год: {book.year}, Статус: {book.status}\n' for book in books]))
+
+
 def get_non_empty_input(prompt: str) -> str:
     """Get non-empty input from the user.
 
@@ -253,6 +859,26 @@ def get_non_empty_input(prompt: str) -> str:
         print('Ввод не может быть пустым. Пожалуйста, попробуйте снова.')
 
 
+def parse_year(value: str) -> int:
+    """Parse a publication year.
+
+    Args:
+        value (str): Year as entered by the user.
+
+    Returns:
+        int: Valid publication year.
+
+    Raises:
+        ValueError: If the value is not a valid publication year.
+    """
+    year = int(value)
+    if year <= 0:
+        raise ValueError('Year must be positive.')
+    if year > datetime.now().year:
+        raise ValueError('Year cannot be greater than the current year.')
+    return year
+
+
 def get_year_input() -> int:
     """Get valid publication year input from the user.
 
@@ -260,16 +886,8 @@ def get_year_input() -> int:
         int: Valid publication year.
     """
     while True:
-        year = input('Введите год издания книги: ')
         try:
-            year = int(year)
-            if year <= 0:
-                raise ValueError('Year must be positive.')
-            if year > datetime.now().year:
-                raise ValueError(
-                    'Year cannot be greater than the current year.')
-            return year
-
+            return parse_year(input('Введите год издания книги: '))
         except ValueError as e:
             logging.warning(f'Invalid year input: {e}')
             print('Некорректный ввод. Пожалуйста, введите корректный год.')
@@ -280,7 +898,8 @@ def search_books(library: Library, search_type: str, query: str) -> List[Book]:
 
     Args:
         library (Library): Library instance to search for books.
-        search_type (str): Type of search ('title', 'author', 'year').
+        search_type (str): Type of search ('title', 'title_prefix', 'author',
+            'year').
         query (str): Query for the search.
 
     Returns:
@@ -288,6 +907,8 @@ def search_books(library: Library, search_type: str, query: str) -> List[Book]:
     """
     if search_type == 'title':
         return library.find_by_title(query)
+    elif search_type == 'title_prefix':
+        return library.find_by_title_prefix(query)
     elif search_type == 'author':
         return library.find_by_author(query)
     elif search_type == 'year':
@@ -325,7 +946,8 @@ def handle_search_books(library: Library) -> None:
     while True:
         search_choice = get_non_empty_input(
             'Выберите критерий поиска:\n1. Поиск по названию\n2. '
-            'Поиск по автору\n3. Поиск по году\nВведите номер критерия: ')
+            'Поиск по автору\n3. Поиск по году\n4. Поиск по началу '
+            'названия\nВведите номер критерия: ')
 
         if search_choice == '1':
             query = get_non_empty_input('Введите название книги для поиска: ')
@@ -339,21 +961,61 @@ def handle_search_books(library: Library) -> None:
             year = get_year_input()
             results = search_books(library, 'year', str(year))
             break
+        elif search_choice == '4':
+            query = get_non_empty_input('Введите начало названия книги: ')
+            results = search_books(library, 'title_prefix', query)
+            break
         else:
             print('Недопустимый выбор. Пожалуйста, попробуйте снова.')
 
     if results:
-        for book in results:
-            print(f'ID: {book.id}, Название: {book.title}, '
-                  f'Автор: {book.author}, Год: {book.year}, '
-                  f'Статус: {book.status}')
+        print_books(results)
     else:
         print('Книги не найдены.')
 
 
+def run_commands(library: Library, lines: Iterable[str]) -> None:
+    """Run commands read from a stream, one per line.
+
+    Supported commands (fields are separated by ``|``)::
+
+        add|<title>|<author>|<year>
+        del|<id>
+        status|<id>|<status>
+
+    Empty lines and lines starting with ``#`` are skipped. All changes are
+    written to the file at once when the stream ends.
+
+    Args:
+        library (Library): Library instance to run the commands on.
+        lines (Iterable[str]): Lines with commands.
+    """
+    with library.batch():
+        for number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            command, *args = [field.strip() for field in line.split('|')]
+            try:
+                if command == 'add' and len(args) == 3 and all(args):
+                    library.add_book(args[0], args[1], parse_year(args[2]))
+                elif command == 'del' and len(args) == 1:
+                    library.remove_book(args[0])
+                elif command == 'status' and len(args) == 2:
+                    library.change_status(args[0], args[1])
+                else:
+                    raise ValueError(f'Unknown command: {line}')
+            except ValueError as e:
+                logging.warning(f'Invalid command on line {number}: {e}')
+                print(f'Строка {number}: некорректная команда.')
+
+
 def main() -> None:
     """Main function to run the program."""
     library = Library(Path('library.json'))
+    if not sys.stdin.isatty():
+        run_commands(library, sys.stdin)
+        return
     while True:
         print('Команды: ')
         print('1. Добавить книгу')
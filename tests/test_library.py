@@ -1,8 +1,9 @@
 import unittest
+from io import StringIO
 from unittest.mock import mock_open, patch
 from pathlib import Path
 import json
-from main import Book, Library
+from main import Book, Library, iter_json_array, run_commands
 
 
 class TestBook(unittest.TestCase):
@@ -20,6 +21,30 @@ class TestBook(unittest.TestCase):
         self.assertEqual(book_dict["title"], "Test Title")
 
 
+class TestIterJsonArray(unittest.TestCase):
+    def test_items_split_across_chunks(self):
+        data = [{"title": "Война и мир", "year": 1869}, 2021, "a, b", [], {}]
+        text = json.dumps(data, ensure_ascii=False, indent=4)
+        for chunk_size in (1, 3, 1024):
+            items = list(iter_json_array(StringIO(text), chunk_size))
+            self.assertEqual(items, data)
+        for text, data in (("[1.5, 2]", [1.5, 2]), ("[12.5e3]", [12.5e3]),
+                           ('["ab", 12.5e3]', ["ab", 12.5e3])):
+            for chunk_size in (1, 2, 3, 4):
+                items = list(iter_json_array(StringIO(text), chunk_size))
+                self.assertEqual(items, data)
+
+    def test_empty_array(self):
+        self.assertEqual(list(iter_json_array(StringIO(" [ ] "))), [])
+        self.assertEqual(list(iter_json_array(StringIO("[1]\n\t "), 1)), [1])
+
+    def test_invalid_data(self):
+        for text in ("", "{}", "[1, 2", "[1 2]", "[1,]", "[1] garbage",
+                     "[1]]", "\xa0[1]", "[1,\xa02]"):
+            with self.assertRaises(json.JSONDecodeError):
+                list(iter_json_array(StringIO(text), 2))
+
+
 class TestLibrary(unittest.TestCase):
     def setUp(self):
         self.test_file = Path("test_library.json")
@@ -32,6 +57,7 @@ class TestLibrary(unittest.TestCase):
     def tearDown(self):
         if self.test_file.exists():
             self.test_file.unlink()
+        self.library.log_filename.unlink(missing_ok=True)
 
     def test_load_books(self):
         self.library.load_books()
@@ -41,6 +67,19 @@ class TestLibrary(unittest.TestCase):
         self.assertEqual(self.library.books[0].year, 2021)
         self.assertEqual(self.library.books[0].status, "available")
 
+    def test_load_books_with_null_status(self):
+        with open(self.test_file, 'w') as f:
+            json.dump([{"title": "Test Title", "author": "Test Author",
+                        "year": 2021, "status": None}], f)
+        library = Library(self.test_file)
+        self.assertIsNone(library.books[0].status)
+
+    def test_load_books_streaming(self):
+        with patch('main.STREAM_THRESHOLD', 0):
+            library = Library(self.test_file)
+        self.assertEqual(len(library.books), 1)
+        self.assertEqual(library.books[0].id, self.library.books[0].id)
+
     def test_save_books(self):
         self.library.books = [
             Book("Test Title 2", "Test Author 2", 2022, "available")]
@@ -53,11 +92,46 @@ class TestLibrary(unittest.TestCase):
         self.assertEqual(content[0]["year"], 2022)
         self.assertEqual(content[0]["status"], "available")
 
+    def test_save_books_skips_unchanged(self):
+        self.test_file.unlink()
+        self.library.save_books()
+        self.assertFalse(self.test_file.exists())
+
+    def test_save_books_after_changing_books(self):
+        book = self.library.find_by_year(2021)[0]
+        book.status = "выдана"
+        book.title = "Test Title 2"
+        self.library.save_books()
+        with open(self.test_file, encoding='utf-8') as f:
+            content = json.load(f)
+        self.assertEqual(content[0]["status"], "выдана")
+        self.assertEqual(content[0]["title"], "Test Title 2")
+
+        self.library.books.append(
+            Book("Test Title 3", "Test Author 3", 2023, "available"))
+        self.library.save_books()
+        with open(self.test_file, encoding='utf-8') as f:
+            self.assertEqual(len(json.load(f)), 2)
+
+    def test_change_status_to_same_status_is_not_logged(self):
+        self.library.add_book("Test Title 2", "Test Author 2", 2022)
+        book_id = self.library.find_by_title("Test Title 2")[0].id
+        self.library.log_filename.unlink()
+        self.library.change_status(book_id, "В наличии")
+        self.assertFalse(self.library.log_filename.exists())
+
     def test_add_book(self):
         self.library.add_book("Test Title", "Test Author", 2021)
         self.assertEqual(len(self.library.books), 1)
         self.assertEqual(self.library.books[0].title, "Test Title")
 
+    def test_add_book_after_deleting_duplicate(self):
+        book_id = self.library.books[0].id
+        self.library.remove_book(book_id)
+        self.library.add_book("Test Title", "Test Author", 2021)
+        self.assertEqual(len(self.library.books), 1)
+        self.assertNotEqual(self.library.books[0].id, book_id)
+
     def test_delete_book(self):
         self.library.add_book("Test Title", "Test Author", 2021)
         book_id = self.library.books[0].id
@@ -67,12 +141,139 @@ class TestLibrary(unittest.TestCase):
 
         self.assertEqual(len(self.library.books), 0)
 
+    def test_changes_survive_reload(self):
+        self.library.add_book("Test Title 2", "Test Author 2", 2022)
+        book_id = self.library.find_by_title("Test Title 2")[0].id
+        self.library.change_status(book_id, "выдана")
+        with patch('builtins.input', return_value=self.library.books[0].id):
+            self.library.delete_book()
+
+        reloaded = Library(self.test_file)
+        self.assertEqual(len(reloaded.books), 1)
+        self.assertEqual(reloaded.books[0].id, book_id)
+        self.assertEqual(reloaded.books[0].status, "выдана")
+
+    def test_torn_log_entry_does_not_swallow_next_operation(self):
+        self.library.add_book("Test Title 2", "Test Author 2", 2022)
+        with open(self.library.log_filename, 'ab') as f:
+            f.write(b'{"op":"add","book":{"id":"x"')
+
+        library = Library(self.test_file)
+        library.add_book("Test Title 3", "Test Author 3", 2023)
+
+        reloaded = Library(self.test_file)
+        self.assertEqual([book.title for book in reloaded.books],
+                         ["Test Title", "Test Title 2", "Test Title 3"])
+
+    def test_failed_append_does_not_swallow_next_operation(self):
+        self.library.add_book("Test Title 2", "Test Author 2", 2022)
+        real_open = Path.open
+
+        def torn_open(path, mode='r', *args, **kwargs):
+            file = real_open(path, mode, *args, **kwargs)
+            file.write(b'{"op":"add","book":{"id":"x"')
+            file.close()
+            raise OSError('No space left on device')
+
+        with patch.object(Path, 'open', torn_open):
+            self.library.add_book("Test Title 3", "Test Author 3", 2023)
+        self.library.add_book("Test Title 4", "Test Author 4", 2024)
+
+        reloaded = Library(self.test_file)
+        self.assertEqual([book.title for book in reloaded.books],
+                         ["Test Title", "Test Title 2", "Test Title 4"])
+
+    def test_batch_writes_log_once(self):
+        with self.library.batch():
+            self.library.add_book("Test Title 2", "Test Author 2", 2022)
+            self.library.add_book("Test Title 3", "Test Author 3", 2023)
+            self.assertFalse(self.library.log_filename.exists())
+        with open(self.library.log_filename, encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 2)
+        self.assertEqual(len(Library(self.test_file).books), 3)
+
+    def test_run_commands(self):
+        book_id = self.library.books[0].id
+        run_commands(self.library, [
+            "add|Test Title 2|Test Author 2|2022\n",
+            "\n",
+            "status|" + book_id + "|выдана\n",
+            "add|Test Title 3|Test Author 3|not a year\n",
+            "del|" + book_id + "\n",
+        ])
+        self.assertEqual([book.title for book in self.library.books],
+                         ["Test Title 2"])
+        self.assertEqual(len(Library(self.test_file).books), 1)
+
     def test_find_by_title(self):
         self.library.add_book("Test Title", "Test Author", 2021)
         results = self.library.find_by_title("Test Title")
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0].title, "Test Title")
 
+    def test_find_by_title_through_haystack(self):
+        self.library.add_book("Война и мир", "Лев Толстой", 1869)
+        self.library.add_book("Мир", "Автор", 2000)
+        with patch('main.SPARSE_HIT_RATIO', 0):
+            self.assertEqual([book.title for book in
+                              self.library.find_by_title("МИР")],
+                             ["Война и мир", "Мир"])
+            self.assertEqual(self.library.find_by_author("толстой")[0].title,
+                             "Война и мир")
+            self.assertEqual(self.library.find_by_title("мир\0"), [])
+
+    def test_find_by_titles(self):
+        self.library.add_book("Война и мир", "Лев Толстой", 1869)
+        self.library.add_book("Анна Каренина", "Лев Толстой", 1877)
+        results = self.library.find_by_titles(["мир", "test"])
+        self.assertEqual({book.title for book in results},
+                         {"Test Title", "Война и мир"})
+        self.assertEqual(self.library.find_by_titles([]), [])
+
+    def test_find_by_title_prefix(self):
+        self.library.add_book("Тестовая книга", "Автор", 2020)
+        self.library.add_book("Test Book", "Test Author", 2022)
+        results = self.library.find_by_title_prefix("TEST")
+        self.assertEqual([book.title for book in results],
+                         ["Test Book", "Test Title"])
+        self.assertEqual(self.library.find_by_title_prefix("Title"), [])
+
+    def test_search_after_renaming_book(self):
+        self.assertEqual(len(self.library.find_by_title("test")), 1)
+        self.assertEqual(len(self.library.find_by_title_prefix("test")), 1)
+        book = self.library.books[0]
+        book.title = "Война и мир"
+        book.author = "Лев Толстой"
+        self.assertEqual(self.library.find_by_title("test"), [])
+        self.assertEqual(self.library.find_by_title_prefix("война"), [book])
+        self.assertEqual(self.library.find_by_titles(["мир"]), [book])
+        self.assertEqual(self.library.find_by_author("толстой"), [book])
+        self.library.add_book("Test Title", "Test Author", 2021)
+        self.assertEqual(len(self.library.books), 2)
+
+    def test_find_by_year_after_changing_year(self):
+        book = self.library.find_by_year(2021)[0]
+        book.year = 1990
+        self.assertEqual(self.library.find_by_year(2021), [])
+        self.assertEqual(self.library.find_by_year(1990), [book])
+        self.library.add_book("Test Title", "Test Author", 1990)
+        self.assertEqual(len(self.library.find_by_year(1990)), 1)
+        self.library.add_book("Test Title", "Test Author", 2021)
+        self.assertEqual(len(self.library.find_by_year(2021)), 1)
+
+    def test_find_by_author_ignores_case(self):
+        self.library.add_book("Война и мир", "Лев Толстой", 1869)
+        results = self.library.find_by_author("ТОЛСТОЙ")
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0].author, "Лев Толстой")
+
+    def test_find_by_year(self):
+        self.library.add_book("Test Title 2", "Test Author 2", 2022)
+        self.assertEqual(len(self.library.find_by_year(2021)), 1)
+        self.assertEqual(self.library.find_by_year(2022)[0].title,
+                         "Test Title 2")
+        self.assertEqual(self.library.find_by_year(1999), [])
+
 
 if __name__ == '__main__':
     unittest.main()